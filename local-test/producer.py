@@ -1,20 +1,51 @@
-import json
+import itertools
+import multiprocessing
+import os
 import random
+import secrets
+import socket
+import sys
+import threading
 import time
-import uuid
-from kafka import KafkaProducer
-from kafka.errors import NoBrokersAvailable
+
+import numpy as np
+import orjson
+from confluent_kafka import Producer
+
+
+def _interned(*values) -> tuple:
+    # Categorical strings are shared by every event; intern them once at import
+    return tuple(sys.intern(v) for v in values)
+
+
+# Producer processes sharing the structured message load
+NUM_WORKERS = 8
+
+# librdkafka settings shared by every producer; workers add 'bootstrap.servers'
+PRODUCER_CONFIG = {
+    # Let librdkafka group records into fewer, compressed requests
+    'linger.ms': 50,
+    'batch.num.messages': 10000,
+    'batch.size': 131072,
+    'compression.type': 'lz4',
+    'acks': 1,
+    'queue.buffering.max.kbytes': 65536,
+    'max.in.flight.requests.per.connection': 5,
+}
 
 # Categorical choices (realistic values)
-SERVICES = ["auth", "orders", "billing", "catalog", "search"]
-ENVS = ["prod", "staging"]
-REGIONS = ["us-east-1", "eu-west-1", "ap-south-1"]
-METHODS = ["GET", "POST", "PUT", "DELETE"]
-EVENT_TYPES = ["login", "purchase", "logout", "password_reset", "view"]
-USER_ROLES = ["admin", "customer", "service"]
-COUNTRIES = ["US", "DE", "IN", "GB", "BR"]
-STATUS_CODES = [200, 201, 204, 400, 401, 403, 404, 409, 429, 500, 502, 503]
-PATHS = [
+SERVICES = _interned("auth", "orders", "billing", "catalog", "search")
+ENVS = _interned("prod", "staging")
+REGIONS = _interned("us-east-1", "eu-west-1", "ap-south-1")
+METHODS = _interned("GET", "POST", "PUT", "DELETE")
+EVENT_TYPES = _interned("login", "purchase", "logout", "password_reset", "view")
+USER_ROLES = _interned("admin", "customer", "service")
+COUNTRIES = _interned("US", "DE", "IN", "GB", "BR")
+SOURCES = _interned("web", "mobile", "service")
+CONTENT_TYPES = _interned("application/json", "text/plain", "application/x-www-form-urlencoded")
+ACCEPTS = _interned("*/*", "application/json")
+STATUS_CODES = (200, 201, 204, 400, 401, 403, 404, 409, 429, 500, 502, 503)
+PATHS = _interned(
     "/api/v1/auth/login",
     "/api/v1/auth/logout",
     "/api/v1/orders",
@@ -23,111 +54,212 @@ PATHS = [
     "/api/v1/catalog/items/42",
     "/api/v1/search",
     "/api/v1/profile",
-]
+)
 
 
-def build_key(service: str, env: str, region: str, user_id: str) -> str:
-    # Structured key derived from categorical fields; no random gibberish strings
-    return f"{service}-{env}-{region}:{user_id[:8]}"
+def _frags(values) -> tuple:
+    # Pre-encoded JSON for each categorical value (same positions), spliced into payloads as-is
+    return tuple(orjson.dumps(v) for v in values)
 
 
-def generate_log_event() -> dict:
-    """Generate a realistic log/event payload with categorical strings and GUIDs."""
-    service = random.choice(SERVICES)
-    env = random.choice(ENVS)
-    region = random.choice(REGIONS)
-    user_id = str(uuid.uuid4())
-
-    req_method = random.choice(METHODS)
-    path = random.choice(PATHS)
-    status = random.choice(STATUS_CODES)
-    duration_ms = random.randint(5, 1500)
-    size_bytes = random.randint(100, 200_000)
-    event_type = random.choice(EVENT_TYPES)
-    role = random.choice(USER_ROLES)
-    country = random.choice(COUNTRIES)
+SERVICE_FRAGS = _frags(SERVICES)
+ENV_FRAGS = _frags(ENVS)
+REGION_FRAGS = _frags(REGIONS)
+METHOD_FRAGS = _frags(METHODS)
+EVENT_TYPE_FRAGS = _frags(EVENT_TYPES)
+USER_ROLE_FRAGS = _frags(USER_ROLES)
+COUNTRY_FRAGS = _frags(COUNTRIES)
+PATH_FRAGS = _frags(PATHS)
+SOURCE_FRAGS = _frags(SOURCES)
+# Every contentType/accept combination, encoded as a complete "headers" object
+HEADER_VARIANTS = tuple(orjson.dumps({"contentType": ct, "accept": ac}) for ct in CONTENT_TYPES for ac in ACCEPTS)
+
+# Same shape and key order as generate_log_event(); only the values vary
+EVENT_TEMPLATE = (
+    b'{"meta":{"id":"%b","timestamp":%d,"service":%b,"env":%b,"region":%b,"source":%b},'
+    b'"request":{"method":%b,"path":%b,"headers":%b},'
+    b'"response":{"status":%d,"duration_ms":%d,"size_bytes":%d,"msg":%b},'
+    b'"user":{"id":"%b","role":%b,"country":%b},'
+    b'"event":{"type":%b,"success":%b}}'
+)
+
 
+# Event IDs only need to be unique within a run: one random prefix per process plus a counter
+_ID_PREFIX = secrets.token_hex(4)
+_id_counter = itertools.count()
+
+
+def _fast_id() -> str:
+    return f"{_ID_PREFIX}{next(_id_counter):016x}"
+
+
+def build_key(service: str, env: str, region: str, user_id: str) -> bytes:
+    # Structured key derived from categorical fields; no random gibberish strings.
+    # Returned pre-encoded so the producer sends it as-is.
+    return f"{service}-{env}-{region}:{user_id[:8]}".encode('ascii')
+
+
+# build_key() output minus the user part, for every service/env/region combination
+KEY_PREFIXES = tuple(
+    tuple(tuple(build_key(service, env, region, "") for region in REGIONS) for env in ENVS)
+    for service in SERVICES
+)
+
+
+def response_msg(status: int) -> str:
     # Optional response message; occasionally include the word "error" to support CONTAINS
     if status >= 500:
-        resp_msg = "internal server error"
+        return "internal server error"
     elif status == 404:
-        resp_msg = "resource not found"
+        return "resource not found"
     elif status >= 400:
-        resp_msg = "client error"
-    else:
-        resp_msg = "ok"
-
-    payload = {
-        "meta": {
-            "id": str(uuid.uuid4()),
-            "timestamp": int(time.time() * 1000),
-            "service": service,
-            "env": env,
-            "region": region,
-            "source": random.choice(["web", "mobile", "service"]),
-        },
-        "request": {
-            "method": req_method,
-            "path": path,
-            "headers": {
-                "contentType": random.choice(["application/json", "text/plain", "application/x-www-form-urlencoded"]),
-                "accept": random.choice(["*/*", "application/json"]),
-            },
-        },
-        "response": {
-            "status": status,
-            "duration_ms": duration_ms,
-            "size_bytes": size_bytes,
-            "msg": resp_msg,
-        },
-        "user": {
-            "id": user_id,
-            "role": role,
-            "country": country,
-        },
-        "event": {
-            "type": event_type,
-            "success": status < 400,
-        },
-    }
-    return payload
+        return "client error"
+    return "ok"
+
+
+# Response message and event.success depend only on the status code; encode them once per code
+STATUS_MSG_FRAGS = tuple(orjson.dumps(response_msg(status)) for status in STATUS_CODES)
+STATUS_SUCCESS_FRAGS = tuple(orjson.dumps(status < 400) for status in STATUS_CODES)
+
+
+# Dedicated RNG for generate_log_event(), with its bound methods cached at module scope
+_random = random.Random()
+_choice = _random.choice
+_randint = _random.randint
+
+# Single payload reused by generate_log_event(); every field is overwritten on each call
+_EVENT = {
+    "meta": {"id": "", "timestamp": 0, "service": "", "env": "", "region": "", "source": ""},
+    "request": {"method": "", "path": "", "headers": {"contentType": "", "accept": ""}},
+    "response": {"status": 0, "duration_ms": 0, "size_bytes": 0, "msg": ""},
+    "user": {"id": "", "role": "", "country": ""},
+    "event": {"type": "", "success": False},
+}
+
+
+def generate_log_event() -> dict:
+    """Generate a realistic log/event payload with categorical strings and hex IDs.
+
+    The same dict is returned every time and overwritten by the next call, so
+    serialize it before generating another event.
+    """
+    meta = _EVENT["meta"]
+    meta["id"] = _fast_id()
+    meta["timestamp"] = time.time_ns() // 1_000_000
+    meta["service"] = _choice(SERVICES)
+    meta["env"] = _choice(ENVS)
+    meta["region"] = _choice(REGIONS)
+    meta["source"] = _choice(SOURCES)
+
+    request = _EVENT["request"]
+    request["method"] = _choice(METHODS)
+    request["path"] = _choice(PATHS)
+    request["headers"]["contentType"] = _choice(CONTENT_TYPES)
+    request["headers"]["accept"] = _choice(ACCEPTS)
+
+    status = _choice(STATUS_CODES)
+    response = _EVENT["response"]
+    response["status"] = status
+    response["duration_ms"] = _randint(5, 1500)
+    response["size_bytes"] = _randint(100, 200_000)
+    response["msg"] = response_msg(status)
+
+    user = _EVENT["user"]
+    user["id"] = secrets.token_hex(16)
+    user["role"] = _choice(USER_ROLES)
+    user["country"] = _choice(COUNTRIES)
+
+    event = _EVENT["event"]
+    event["type"] = _choice(EVENT_TYPES)
+    event["success"] = status < 400
+    return _EVENT
+
+
+def build_events(num_messages: int, rng: np.random.Generator):
+    """Yield (key, value) bytes for num_messages structured events.
+
+    Every random field is drawn for the whole run up front with NumPy; the loop only
+    indexes those draws, picks the key prefix and splices pre-encoded fragments into
+    EVENT_TEMPLATE, so the categorical choices are made once for both key and value.
+    """
+    def draw(values) -> list:
+        return rng.integers(0, len(values), num_messages).tolist()
+
+    columns = zip(
+        draw(SERVICES),
+        draw(ENVS),
+        draw(REGIONS),
+        draw(SOURCES),
+        draw(METHODS),
+        draw(PATHS),
+        draw(HEADER_VARIANTS),
+        draw(STATUS_CODES),
+        rng.integers(5, 1501, num_messages).tolist(),
+        rng.integers(100, 200_001, num_messages).tolist(),
+        draw(USER_ROLES),
+        draw(COUNTRIES),
+        draw(EVENT_TYPES),
+        range(0, 32 * num_messages, 32),
+    )
+    # User IDs for the whole run come from one bulk random draw, hex-encoded once and sliced per event
+    user_ids = rng.bytes(16 * num_messages).hex().encode('ascii')
+    for svc, env_i, region_i, src, method, path, headers, status_i, duration_ms, size_bytes, role, country, event_type, uid in columns:
+        user_id = user_ids[uid:uid + 32]
+        key = KEY_PREFIXES[svc][env_i][region_i] + user_id[:8]
+        value = EVENT_TEMPLATE % (
+            _fast_id().encode(),
+            time.time_ns() // 1_000_000,
+            SERVICE_FRAGS[svc],
+            ENV_FRAGS[env_i],
+            REGION_FRAGS[region_i],
+            SOURCE_FRAGS[src],
+            METHOD_FRAGS[method],
+            PATH_FRAGS[path],
+            HEADER_VARIANTS[headers],
+            STATUS_CODES[status_i],
+            duration_ms,
+            size_bytes,
+            STATUS_MSG_FRAGS[status_i],
+            user_id,
+            USER_ROLE_FRAGS[role],
+            COUNTRY_FRAGS[country],
+            EVENT_TYPE_FRAGS[event_type],
+            STATUS_SUCCESS_FRAGS[status_i],
+        )
+        yield key, value
+
+def _log_err(err, msg):
+    # Delivery report callback; only failures are worth printing
+    if err is not None:
+        print(f"Delivery failed for key {msg.key()!r}: {err}")
+
+def _produce(producer, topic, key, value):
+    # When librdkafka's local queue is full, serve delivery reports to drain it and retry
+    while True:
+        try:
+            producer.produce(topic, key=key, value=value, on_delivery=_log_err)
+            return
+        except BufferError:
+            producer.poll(1)
 
 def wait_for_kafka(bootstrap_servers, max_retries=30):
     """Wait for Kafka to be ready"""
+    brokers = [(host, int(port)) for host, port in (s.rsplit(':', 1) for s in bootstrap_servers.split(','))]
     for i in range(max_retries):
         try:
-            producer = KafkaProducer(
-                bootstrap_servers=bootstrap_servers,
-                value_serializer=lambda v: json.dumps(v).encode('utf-8')
-            )
-            producer.close()
+            # A plain TCP connect is enough to know a listener is up; the real producer is built once per worker
+            for host, port in brokers:
+                socket.create_connection((host, port), timeout=2).close()
             print("Kafka is ready!")
             return True
-        except NoBrokersAvailable:
+        except OSError:
             print(f"Waiting for Kafka... (attempt {i+1}/{max_retries})")
             time.sleep(2)
     return False
 
-def main():
-    bootstrap_servers = ['kafka:29092']
-    topic = 'random-data'
-    num_messages = 10000
-    
-    print("Waiting for Kafka to be available...")
-    if not wait_for_kafka(bootstrap_servers):
-        print("Failed to connect to Kafka after maximum retries")
-        return
-    
-    print("Creating Kafka producer...")
-    producer = KafkaProducer(
-        bootstrap_servers=bootstrap_servers,
-        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-        key_serializer=lambda k: k.encode('utf-8') if k else None
-    )
-    
-    print(f"Starting to produce seed messages then {num_messages} structured messages to topic '{topic}'...")
-
+def produce_seed_messages(producer, topic) -> int:
     # Seed messages crafted to exercise query features (AND/OR, CONTAINS, !=/<> and JSON paths)
+    # generate_log_event() reuses one dict, so each seed is encoded before the next is generated
     seed_payloads = []
 
     # 1) auth-prod key with PUT and an error in response msg
@@ -139,7 +271,7 @@ def main():
     p1["response"]["status"] = 500
     p1["response"]["msg"] = "hello error world"
     k1 = build_key(p1["meta"]["service"], p1["meta"]["env"], p1["meta"]["region"], p1["user"]["id"])
-    seed_payloads.append((k1, p1))
+    seed_payloads.append((k1, orjson.dumps(p1)))
 
     # 2) orders service, non-GET method
     p2 = generate_log_event()
@@ -148,7 +280,7 @@ def main():
     p2["response"]["status"] = 201
     p2["response"]["msg"] = "ok"
     k2 = build_key(p2["meta"]["service"], p2["meta"]["env"], p2["meta"]["region"], p2["user"]["id"])
-    seed_payloads.append((k2, p2))
+    seed_payloads.append((k2, orjson.dumps(p2)))
 
     # 3) billing service with a not-found error
     p3 = generate_log_event()
@@ -157,7 +289,7 @@ def main():
     p3["response"]["status"] = 404
     p3["response"]["msg"] = "not found error"
     k3 = build_key(p3["meta"]["service"], p3["meta"]["env"], p3["meta"]["region"], p3["user"]["id"])
-    seed_payloads.append((k3, p3))
+    seed_payloads.append((k3, orjson.dumps(p3)))
 
     # 4) catalog service, GET success false (e.g., 503)
     p4 = generate_log_event()
@@ -166,7 +298,7 @@ def main():
     p4["response"]["status"] = 503
     p4["response"]["msg"] = "service unavailable error"
     k4 = build_key(p4["meta"]["service"], p4["meta"]["env"], p4["meta"]["region"], p4["user"]["id"])
-    seed_payloads.append((k4, p4))
+    seed_payloads.append((k4, orjson.dumps(p4)))
 
     # 5) purchase event success=true for filtering
     p5 = generate_log_event()
@@ -174,26 +306,71 @@ def main():
     p5["response"]["status"] = 200
     p5["response"]["msg"] = "ok"
     k5 = build_key(p5["meta"]["service"], p5["meta"]["env"], p5["meta"]["region"], p5["user"]["id"])
-    seed_payloads.append((k5, p5))
+    seed_payloads.append((k5, orjson.dumps(p5)))
 
     for k, v in seed_payloads:
-        producer.send(topic, key=k, value=v)
+        _produce(producer, topic, k, v)
 
-    print(f"Produced {len(seed_payloads)} seed messages...")
+    return len(seed_payloads)
+
+
+def worker(shard_id: int, num_messages: int, bootstrap_servers: str, topic: str) -> int:
+    """Produce num_messages structured events from one process; shard 0 also sends the seed messages."""
+    producer = Producer({**PRODUCER_CONFIG, 'bootstrap.servers': bootstrap_servers})
+
+    if shard_id == 0:
+        print(f"Produced {produce_seed_messages(producer, topic)} seed messages...")
+
+    produced = [0]
+    done = threading.Event()
+
+    def report_progress():
+        # Serve delivery reports and print progress once a second, off the produce loop
+        while not done.wait(1.0):
+            producer.poll(0)
+            print(f"[worker {shard_id}] Produced {produced[0]} structured messages...")
+
+    reporter = threading.Thread(target=report_progress, daemon=True)
+    reporter.start()
+
+    rng = np.random.default_rng()
+    for key, value in build_events(num_messages, rng):
+        _produce(producer, topic, key, value)
+        produced[0] += 1
+
+    done.set()
+    reporter.join()
 
-    for i in range(num_messages):
-        payload = generate_log_event()
-        key = build_key(payload["meta"]["service"], payload["meta"]["env"], payload["meta"]["region"], payload["user"]["id"])
-        producer.send(topic, key=key, value=payload)
-        if (i + 1) % 1000 == 0:
-            print(f"Produced {i + 1} structured messages...")
-    
     # Wait for all messages to be delivered
     producer.flush()
-    print(f"Successfully produced {num_messages} messages!")
+    return num_messages
+
+def _init_worker():
+    # Forked workers inherit the parent's RNG state and ID prefix; give each its own
+    global _ID_PREFIX
+    _random.seed(os.getpid())
+    _ID_PREFIX = secrets.token_hex(4)
+
+def main():
+    bootstrap_servers = 'kafka:29092'
+    topic = 'random-data'
+    num_messages = 10000
+    
+    print("Waiting for Kafka to be available...")
+    if not wait_for_kafka(bootstrap_servers):
+        print("Failed to connect to Kafka after maximum retries")
+        return
     
-    producer.close()
-    print("Producer finished and closed.")
+    print(f"Starting {NUM_WORKERS} producer processes for seed messages then {num_messages} structured messages to topic '{topic}'...")
+
+    # Split the run across processes; the first num_messages % NUM_WORKERS shards take one extra
+    base, extra = divmod(num_messages, NUM_WORKERS)
+    shards = [(i, base + (i < extra), bootstrap_servers, topic) for i in range(NUM_WORKERS)]
+    with multiprocessing.Pool(NUM_WORKERS, initializer=_init_worker) as pool:
+        produced = sum(pool.starmap(worker, shards))
+
+    print(f"Successfully produced {produced} messages!")
+    print("Producer finished.")
 
 if __name__ == "__main__":
     main()